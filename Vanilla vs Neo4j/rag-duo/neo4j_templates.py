@@ -1,107 +1,289 @@
 # neo4j_templates.py
 from __future__ import annotations
+from collections import OrderedDict
+from enum import IntEnum
 from typing import Dict, Any, List
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, Result, RoutingControl
+import atexit
+import functools
 import os
+import re
+import threading
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USER = os.getenv("NEO4J_USER", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "")
+# Cached template rows live for CACHE_TTL seconds; after re-importing the
+# calendar, call invalidate() (or restart) to drop them sooner.
+CACHE_TTL = float(os.getenv("TEMPLATE_CACHE_TTL", "3600"))
+CACHE_MAXSIZE = 512
 
 # ---- Neo4j helper ----
+# One driver per process: it owns the Bolt connection pool, so reusing it skips
+# the TCP/auth handshake on every template call.
+_DRIVER = None
+_DRIVER_LOCK = threading.Lock()
+
+def get_driver():
+    global _DRIVER
+    if _DRIVER is None:
+        with _DRIVER_LOCK:
+            if _DRIVER is None:
+                _DRIVER = GraphDatabase.driver(
+                    NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD), max_connection_pool_size=50
+                )
+                atexit.register(_DRIVER.close)
+                ensure_indexes(_DRIVER)
+                warmup_plans(_DRIVER)
+    return _DRIVER
+
 def run_cypher(query: str, params: Dict[str, Any] | None = None) -> List[Dict[str, Any]]:
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    try:
-        with driver.session() as s:
-            return s.run(query, params or {}).data()
-    finally:
-        driver.close()
+    # execute_query: managed retries, read routing, no session boilerplate
+    return get_driver().execute_query(
+        query, params or {}, routing_=RoutingControl.READ, result_transformer_=Result.data
+    )
+
+# ---- Result cache (LRU + TTL) ----
+_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+def invalidate() -> None:
+    """Drop every cached template result, e.g. right after a calendar re-import."""
+    with _CACHE_LOCK:
+        _CACHE.clear()
+
+def cached(name: str):
+    """Cache a template's rows keyed by (name, args), for up to CACHE_TTL seconds."""
+    def wrap(fn):
+        @functools.wraps(fn)
+        def inner(*args, **kwargs) -> List[Dict[str, Any]]:
+            key = (name, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with _CACHE_LOCK:
+                hit = _CACHE.get(key)
+                if hit is not None and now - hit[0] < CACHE_TTL:
+                    _CACHE.move_to_end(key)
+                    # hand out copies so callers can't mutate the cached rows
+                    return [dict(r) for r in hit[1]]
+            rows = fn(*args, **kwargs)
+            with _CACHE_LOCK:
+                _CACHE[key] = (now, tuple(dict(r) for r in rows))
+                _CACHE.move_to_end(key)
+                while len(_CACHE) > CACHE_MAXSIZE:
+                    _CACHE.popitem(last=False)
+            return rows
+        return inner
+    return wrap
 
 # ---- Cypher templates (deterministic) ----
+# Every value is bound as a $param (window dates as 'YYYY-MM-DD' strings, month
+# boundaries built from $year/$month in Cypher) so the query text never changes
+# between calls and Neo4j reuses one cached plan per template.
+Q_CLASSES_BEGIN_DATE = """
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event {name:'Classes Begin'})
+RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
+LIMIT 1
+"""
+
+Q_AFTER_BEGIN = """
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(cb:Event {name:'Classes Begin'})
+WITH cb.start_date AS anchor
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+WHERE e.start_date > anchor
+RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
+ORDER BY e.start_date
+"""
+
+Q_WEEKDAY = """
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+WHERE e.start_weekday = $weekday
+RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
+ORDER BY e.start_date
+"""
+
+Q_MONTH = """
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+WHERE e.start_date >= date({year:$year, month:$month, day:1})
+  AND e.start_date < date({year:$year, month:$month, day:1}) + duration({months:1})
+RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
+ORDER BY e.start_date
+"""
+
+Q_WINDOW = """
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+WHERE e.start_date >= date($start) AND e.start_date <= date($end)
+RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
+ORDER BY e.start_date
+"""
+
+# Same-day and overlap pairs are built from one collected event list instead of
+# a Term x Term self-join; DISTINCT keeps an event reached twice (duplicate
+# HAS_EVENT edges or Term nodes) from being paired with itself.
+Q_SAME_DAY = """
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+WHERE e.start_date IS NOT NULL
+WITH e ORDER BY id(e)
+WITH e.start_date AS d, collect(DISTINCT e) AS es
+WHERE size(es) > 1
+UNWIND range(0, size(es) - 2) AS i
+UNWIND range(i + 1, size(es) - 1) AS j
+RETURN es[i].name AS event1, es[j].name AS event2, toString(d) AS date
+ORDER BY date
+"""
+
+# no self-join, but still one overlap test per i<j pair; event1 is the lower id
+Q_OVERLAPS = """
+MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+WHERE e.start_date IS NOT NULL AND e.end_date IS NOT NULL
+WITH collect(DISTINCT e) AS es
+UNWIND range(0, size(es) - 2) AS i
+WITH es, i, es[i] AS x
+UNWIND [j IN range(i + 1, size(es) - 1)
+        WHERE es[j].start_date <= x.end_date AND x.start_date <= es[j].end_date] AS j
+WITH x, es[j] AS y
+WITH CASE WHEN id(x) < id(y) THEN x ELSE y END AS a,
+     CASE WHEN id(x) < id(y) THEN y ELSE x END AS b
+RETURN a.name AS event1, toString(a.start_date) AS a_start, toString(a.end_date) AS a_end,
+       b.name AS event2, toString(b.start_date) AS b_start, toString(b.end_date) AS b_end
+ORDER BY a_start, b_start
+"""
+
 def t_classes_begin_date(term: str) -> List[Dict[str, Any]]:
-    q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event {name:'Classes Begin'})
-    RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
-    LIMIT 1
-    """
-    return run_cypher(q, {"term": term})
+    return run_cypher(Q_CLASSES_BEGIN_DATE, {"term": term})
 
 def t_after_begin(term: str) -> List[Dict[str, Any]]:
-    q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(cb:Event {name:'Classes Begin'})
-    WITH cb.start_date AS anchor
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
-    WHERE e.start_date > anchor
-    RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
-    ORDER BY e.start_date
-    """
-    return run_cypher(q, {"term": term})
+    return run_cypher(Q_AFTER_BEGIN, {"term": term})
 
 def t_weekday(term: str, weekday: str) -> List[Dict[str, Any]]:
-    q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
-    WHERE e.start_weekday = $weekday
-    RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
-    ORDER BY e.start_date
-    """
-    return run_cypher(q, {"term": term, "weekday": weekday})
+    return run_cypher(Q_WEEKDAY, {"term": term, "weekday": weekday})
 
 def t_month(term: str, year: int, month: int) -> List[Dict[str, Any]]:
-    # 1 <= month <= 12
-    start = f"{year:04d}-{month:02d}-01"
-    # naive end: next month 01
-    if month == 12:
-        end = f"{year+1:04d}-01-01"
-    else:
-        end = f"{year:04d}-{month+1:02d}-01"
-    q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
-    WHERE e.start_date >= date($start) AND e.start_date < date($end)
-    RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
-    ORDER BY e.start_date
-    """
-    return run_cypher(q, {"term": term, "start": start, "end": end})
+    # 1 <= month <= 12; the month window is computed in Cypher
+    return run_cypher(Q_MONTH, {"term": term, "year": year, "month": month})
 
 def t_window(term: str, start: str, end: str) -> List[Dict[str, Any]]:
     # start/end = 'YYYY-MM-DD'
-    q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
-    WHERE e.start_date >= date($start) AND e.start_date <= date($end)
-    RETURN e.name AS name, toString(e.start_date) AS start_date, toString(e.end_date) AS end_date, e.source AS source
-    ORDER BY e.start_date
-    """
-    return run_cypher(q, {"term": term, "start": start, "end": end})
+    return run_cypher(Q_WINDOW, {"term": term, "start": start, "end": end})
 
 def t_same_day(term: str) -> List[Dict[str, Any]]:
-    q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(a:Event),
-          (:Term {name:$term})-[:HAS_EVENT]->(b:Event)
-    WHERE a.start_date = b.start_date AND id(a) < id(b)
-    RETURN a.name AS event1, b.name AS event2, toString(a.start_date) AS date
-    ORDER BY date
-    """
-    return run_cypher(q, {"term": term})
+    return run_cypher(Q_SAME_DAY, {"term": term})
 
 def t_overlaps(term: str) -> List[Dict[str, Any]]:
-    q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(a:Event),
-          (:Term {name:$term})-[:HAS_EVENT]->(b:Event)
-    WHERE a.start_date <= b.end_date AND b.start_date <= a.end_date AND id(a) < id(b)
-    RETURN a.name AS event1, toString(a.start_date) AS a_start, toString(a.end_date) AS a_end,
-           b.name AS event2, toString(b.start_date) AS b_start, toString(b.end_date) AS b_end
-    ORDER BY a_start, b_start
-    """
-    return run_cypher(q, {"term": term})
+    return run_cypher(Q_OVERLAPS, {"term": term})
+
+# ---- Schema ----
+# Mirrors rag_neo4j/schema.cypher. Every template seeks Term by name and filters
+# Event by start_date / start_weekday; without these the planner falls back to
+# label scans. No text index on e.name: templates match it by equality.
+_SCHEMA = [
+    "CREATE CONSTRAINT term_name_unique IF NOT EXISTS FOR (t:Term) REQUIRE t.name IS UNIQUE",
+    "CREATE INDEX event_name_index IF NOT EXISTS FOR (e:Event) ON (e.name)",
+    "CREATE INDEX event_start_date_index IF NOT EXISTS FOR (e:Event) ON (e.start_date)",
+    "CREATE INDEX event_end_date_index IF NOT EXISTS FOR (e:Event) ON (e.end_date)",
+    "CREATE INDEX event_start_weekday_index IF NOT EXISTS FOR (e:Event) ON (e.start_weekday)",
+]
+
+def ensure_indexes(driver) -> None:
+    # idempotent (IF NOT EXISTS); best-effort so a read-only user can still query
+    try:
+        with driver.session() as s:
+            for stmt in _SCHEMA:
+                s.run(stmt).consume()
+    except Exception:
+        pass
+
+# ---- Plan warmup ----
+# EXPLAIN compiles and caches a plan without touching data; placeholder values only
+# need the right types.
+_WARMUP = [
+    (Q_CLASSES_BEGIN_DATE, {"term": ""}),
+    (Q_AFTER_BEGIN,        {"term": ""}),
+    (Q_WEEKDAY,            {"term": "", "weekday": ""}),
+    (Q_MONTH,              {"term": "", "year": 2000, "month": 1}),
+    (Q_WINDOW,             {"term": "", "start": "2000-01-01", "end": "2000-01-01"}),
+    (Q_SAME_DAY,           {"term": ""}),
+    (Q_OVERLAPS,           {"term": ""}),
+]
+
+def warmup_plans(driver) -> None:
+    try:
+        with driver.session() as s:
+            for q, params in _WARMUP:
+                s.run("EXPLAIN " + q, params).consume()
+    except Exception:
+        # warmup is best-effort; a real query will surface connection problems
+        pass
 
 # ---- Template registry (for router to call) ----
+class TKey(IntEnum):
+    CLASSES_BEGIN_DATE = 0
+    AFTER_BEGIN = 1
+    WEEKDAY = 2
+    MONTH = 3
+    WINDOW = 4
+    SAME_DAY = 5
+    OVERLAPS = 6
+
+# Indexed by TKey: a tuple index instead of a string hash + nested dict per dispatch.
+_NAMES = ("classes-begin-date", "after-begin", "weekday", "month", "window", "same-day", "overlaps")
+_FNS = tuple(
+    cached(name)(fn)
+    for name, fn in zip(_NAMES, (t_classes_begin_date, t_after_begin, t_weekday, t_month,
+                                 t_window, t_same_day, t_overlaps))
+)
+_PARAMS = (
+    ("term",),
+    ("term",),
+    ("term", "weekday"),
+    ("term", "year", "month"),
+    ("term", "start", "end"),
+    ("term",),
+    ("term",),
+)
+
+def dispatch(k: TKey, **kwargs: Any) -> List[Dict[str, Any]]:
+    return _FNS[k](**kwargs)
+
+# Name-keyed view kept for existing callers.
 TEMPLATES = {
-    "classes-begin-date": {"fn": t_classes_begin_date, "params": ["term"]},
-    "after-begin":        {"fn": t_after_begin,        "params": ["term"]},
-    "weekday":            {"fn": t_weekday,            "params": ["term", "weekday"]},
-    "month":              {"fn": t_month,              "params": ["term", "year", "month"]},
-    "window":             {"fn": t_window,             "params": ["term", "start", "end"]},
-    "same-day":           {"fn": t_same_day,           "params": ["term"]},
-    "overlaps":           {"fn": t_overlaps,           "params": ["term"]},
+    name: {"fn": _FNS[k], "params": list(_PARAMS[k])} for k, name in zip(TKey, _NAMES)
 }
+
+# ---- Batched execution ----
+# Several templates in one round trip: each becomes a CALL {} subquery whose row is
+# packed into a map, and the branches are glued with UNION ALL.
+_EVENT_COLS = ("name", "start_date", "end_date", "source")
+_BATCH_SPECS = {
+    "classes-begin-date": (Q_CLASSES_BEGIN_DATE, _EVENT_COLS),
+    "after-begin":        (Q_AFTER_BEGIN,        _EVENT_COLS),
+    "weekday":            (Q_WEEKDAY,            _EVENT_COLS),
+    "month":              (Q_MONTH,              _EVENT_COLS),
+    "window":             (Q_WINDOW,             _EVENT_COLS),
+    "same-day":           (Q_SAME_DAY,           ("event1", "event2", "date")),
+    "overlaps":           (Q_OVERLAPS,           ("event1", "a_start", "a_end", "event2", "b_start", "b_end")),
+}
+_PARAM_RE = re.compile(r"\$(\w+)")
+
+def run_templates_batched(calls: List[tuple[str, Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Run [(template_name, kwargs), ...] as one Cypher statement; rows keyed by name."""
+    names = [name for name, _ in calls]
+    if len(set(names)) != len(names):
+        raise ValueError("run_templates_batched: each template may appear only once")
+    parts: List[str] = []
+    params: Dict[str, Any] = {}
+    for i, (name, kwargs) in enumerate(calls):
+        q, cols = _BATCH_SPECS[name]
+        prefix = f"p{i}_"
+        body = _PARAM_RE.sub(lambda m: "$" + prefix + m.group(1), q)
+        params.update({prefix + k: v for k, v in kwargs.items()})
+        row = ", ".join(f"{c}: {c}" for c in cols)
+        parts.append(f"CALL {{{body}}}\nRETURN {i} AS idx, {{{row}}} AS row")
+    out: Dict[str, List[Dict[str, Any]]] = {name: [] for name in names}
+    if not parts:
+        return out
+    for rec in run_cypher("\nUNION ALL\n".join(parts), params):
+        out[names[rec["idx"]]].append(rec["row"])
+    return out
@@ -4,10 +4,20 @@ import os
 import sys
 import re
 import json
-from typing import List, Dict, Any, Optional, Tuple
+import atexit
+import functools
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple, Callable, NamedTuple
 
 import requests
-from neo4j import GraphDatabase
+from requests.adapters import HTTPAdapter
+from neo4j import GraphDatabase, Result, RoutingControl, READ_ACCESS
 
 try:
     from tabulate import tabulate
@@ -15,6 +25,15 @@ try:
 except ImportError:
     HAVE_TABULATE = False
 
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so one except clause fits both
+_json_loads = orjson.loads if HAVE_ORJSON else json.loads
+
 
 # ---------- CONFIG: EDIT THESE FOR YOUR SETUP ----------
 NEO4J_URI = "bolt://localhost:7687"   # or "neo4j://localhost:7687"
@@ -23,6 +42,14 @@ NEO4J_PASSWORD = "Chintu@2025"
 
 OLLAMA_HOST = "http://localhost:11434"
 OLLAMA_MODEL = "llama3.2:3b"
+# keep the model (and the KV cache of the shared system prompt) loaded between calls
+OLLAMA_KEEP_ALIVE = "30m"
+OLLAMA_NUM_CTX = 4096
+
+# On-disk cache of LLM rewrites; set LLM_CACHE_PATH="" to disable.
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH", str(Path.home() / ".cache" / "campusassist" / "llm.sqlite")
+)
 
 
 WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
@@ -32,44 +59,130 @@ MONTHS = {
     "september": 9, "october": 10, "november": 11, "december": 12
 }
 
+# Precompiled once; the extractors below run on every question.
+_TERM_RE = re.compile(r"\b(Fall|Spring|Summer)\s+(\d{4})\b", re.IGNORECASE)
+_YEAR_RE = re.compile(r"\b(20\d{2})\b")
+_MONTH_RE = re.compile("|".join(MONTHS))
+_WEEKDAY_VARIANTS = [(wd.lower(), wd) for wd in WEEKDAYS]
+
+ANCHOR_PHRASES = {
+    "classes end": "Classes End",
+    "class end": "Classes End",
+    "end of classes": "Classes End",
+    "classes begin": "Classes Begin",
+    "classes start": "Classes Begin",
+    "start of classes": "Classes Begin",
+}
+# One pass over the question; the lookahead reports overlapping phrases too.
+_ANCHOR_RE = re.compile("(?=(" + "|".join(map(re.escape, ANCHOR_PHRASES)) + "))")
+
 
 # ---------- NEO4J HELPER ----------
+_DRIVER = None
+_DRIVER_LOCK = threading.Lock()
+
+
+def get_driver():
+    """
+    Lazily create one driver per process and reuse its connection pool.
+    """
+    global _DRIVER
+    if _DRIVER is None:
+        with _DRIVER_LOCK:
+            if _DRIVER is None:
+                _DRIVER = GraphDatabase.driver(
+                    NEO4J_URI,
+                    auth=(NEO4J_USER, NEO4J_PASSWORD),
+                    max_connection_pool_size=50,
+                )
+                atexit.register(_DRIVER.close)
+    return _DRIVER
+
+
 def run_cypher(query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-    driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
-    try:
-        with driver.session() as s:
-            return s.run(query, params or {}).data()
-    finally:
-        driver.close()
+    """
+    One read query through the driver's execute_query, which routes it to a
+    reader and retries transient failures.
+    """
+    return get_driver().execute_query(
+        query, params or {}, routing_=RoutingControl.READ, result_transformer_=Result.data
+    )
+
+
+def run_cypher_many(queries: List[Tuple[str, Dict[str, Any]]]) -> List[List[Dict[str, Any]]]:
+    """
+    Run several read queries in one managed read transaction,
+    i.e. one session and one commit instead of a round trip per query.
+    """
+    def work(tx):
+        return [tx.run(q, p).data() for q, p in queries]
+
+    with get_driver().session(default_access_mode=READ_ACCESS) as s:
+        return s.execute_read(work)
 
 
 # ---------- OLLAMA HELPER ----------
-def call_ollama(prompt: str, temperature: float = 0.2) -> str:
+# Keep-alive session so repeated calls reuse the same connection to Ollama.
+_SESSION = requests.Session()
+_SESSION.headers.update({"Connection": "keep-alive"})
+_SESSION.mount("http://", HTTPAdapter(pool_connections=10, pool_maxsize=10))
+atexit.register(_SESSION.close)
+
+
+def call_ollama(
+    prompt: str,
+    temperature: float = 0.2,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    num_predict: Optional[int] = None,
+    system: Optional[str] = None,
+) -> Tuple[str, bool]:
+    """
+    Stream a chat completion from Ollama. Each text fragment is handed to
+    `on_chunk` as soon as it arrives. Returns (text, done): `done` is True only
+    if Ollama sent its final `done: true` message, i.e. the text is complete
+    (an `{"error": ...}` line or a dropped stream leaves it False).
+    `num_predict` caps the number of generated tokens. A fixed `system`
+    message is sent first so Ollama can reuse its prefix cache across calls.
+    """
+    options: Dict[str, Any] = {"temperature": temperature, "num_ctx": OLLAMA_NUM_CTX}
+    if num_predict is not None:
+        options["num_predict"] = num_predict
+    messages = [{"role": "user", "content": prompt}]
+    if system:
+        messages.insert(0, {"role": "system", "content": system})
     payload = {
         "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "options": {"temperature": temperature},
+        "messages": messages,
+        "stream": True,
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+        "options": options,
     }
-    with requests.post(
-        f"{OLLAMA_HOST}/api/generate",
+    with _SESSION.post(
+        f"{OLLAMA_HOST}/api/chat",
         json=payload,
         stream=True,
         timeout=600,
     ) as r:
         r.raise_for_status()
-        chunks: List[str] = []
-        for line in r.iter_lines(decode_unicode=True):
+        # accumulate raw UTF-8 bytes and decode once at the end
+        buf = bytearray()
+        done = False
+        for line in r.iter_lines(decode_unicode=False):
             if not line:
                 continue
             try:
-                data = json.loads(line)
-                if "response" in data:
-                    chunks.append(data["response"])
+                data = _json_loads(line)
+                text = data.get("message", {}).get("content")
+                if text:
+                    buf.extend(text.encode("utf-8"))
+                    if on_chunk:
+                        on_chunk(text)
                 if data.get("done"):
+                    done = True
                     break
             except json.JSONDecodeError:
-                chunks.append(line)
-        return "".join(chunks).strip()
+                buf.extend(line)
+        return buf.decode("utf-8", errors="replace").strip(), done
 
 
 # ---------- QUESTION PARSING ----------
@@ -77,54 +190,77 @@ def extract_term(question: str) -> Optional[str]:
     """
     Match 'Fall 2025', 'Spring 2026', etc.
     """
-    m = re.search(r"\b(Fall|Spring|Summer)\s+(\d{4})\b", question, re.IGNORECASE)
+    m = _TERM_RE.search(question)
     if not m:
         return None
     return f"{m.group(1).title()} {m.group(2)}"
 
 
-def extract_weekday(question: str) -> Optional[str]:
-    ql = question.lower()
-    for wd in WEEKDAYS:
-        if wd.lower() in ql or (wd.lower() + "s") in ql:
+def extract_weekday(question: str, ql: Optional[str] = None) -> Optional[str]:
+    ql = ql or question.lower()
+    # a plural ("mondays") contains the singular, so one substring test covers both
+    for low, wd in _WEEKDAY_VARIANTS:
+        if low in ql:
             return wd
     return None
 
 
-def extract_month(question: str) -> Optional[Tuple[int, int]]:
+def extract_month(question: str, ql: Optional[str] = None) -> Optional[Tuple[int, int]]:
     """
     Returns (year, month) if found, otherwise None.
     Needs a year in the question like 2025.
     """
-    ql = question.lower()
-    found_month = None
-    for name, num in MONTHS.items():
-        if name in ql:
-            found_month = num
-            break
+    ql = ql or question.lower()
+    # several months named: the earliest in the calendar wins, not the leftmost in the text
+    found_month = min((MONTHS[m] for m in _MONTH_RE.findall(ql)), default=None)
     if not found_month:
         return None
 
-    m_year = re.search(r"\b(20\d{2})\b", ql)
+    m_year = _YEAR_RE.search(ql)
     if not m_year:
         return None
     year = int(m_year.group(1))
     return year, found_month
 
 
-def detect_anchor(question: str) -> Optional[str]:
+def detect_anchor(question: str, ql: Optional[str] = None) -> Optional[str]:
     """
     Detect anchor events like Classes Begin / Classes End
     """
-    ql = question.lower()
-    if "classes end" in ql or "class end" in ql or "end of classes" in ql:
-        return "Classes End"
-    if "classes begin" in ql or "classes start" in ql or "start of classes" in ql:
-        return "Classes Begin"
+    ql = ql or question.lower()
+    found = {ANCHOR_PHRASES[m.group(1)] for m in _ANCHOR_RE.finditer(ql)}
+    # "Classes End" takes precedence when both are mentioned
+    for anchor in ("Classes End", "Classes Begin"):
+        if anchor in found:
+            return anchor
     return None
 
 
-def classify_intent(question: str) -> str:
+class QuestionFeatures(NamedTuple):
+    ql: str
+    term: Optional[str]
+    anchor: Optional[str]
+    weekday: Optional[str]
+    month_info: Optional[Tuple[int, int]]
+
+
+@functools.lru_cache(maxsize=256)
+def parse_question(question: str) -> QuestionFeatures:
+    """
+    Lowercase the question once and run each extractor once.
+    Cached, so routing and the factual summary share a single parse.
+    """
+    ql = question.lower()
+    return QuestionFeatures(
+        ql=ql,
+        term=extract_term(question),
+        anchor=detect_anchor(question, ql),
+        weekday=extract_weekday(question, ql),
+        month_info=extract_month(question, ql),
+    )
+
+
+def classify_intent(question: str, feats: Optional[QuestionFeatures] = None) -> str:
     """
     Determine which kind of query this is, based on simple rules.
 
@@ -137,22 +273,25 @@ def classify_intent(question: str) -> str:
     - 'month'
     - 'classes_start'
     - 'all_events'
+
+    Pass `feats` (from parse_question) to reuse an existing parse.
     """
-    ql = question.lower()
+    feats = feats or parse_question(question)
+    ql = feats.ql
 
     if "overlap" in ql or "overlapping" in ql:
         return "overlaps"
     if "same day" in ql or "same-day" in ql:
         return "same_day"
-    if "after" in ql and detect_anchor(question):
+    if "after" in ql and feats.anchor:
         return "after_anchor"
-    if "before" in ql and detect_anchor(question):
+    if "before" in ql and feats.anchor:
         return "before_anchor"
     if "start" in ql and "class" in ql:
         return "classes_start"
-    if extract_weekday(question):
+    if feats.weekday:
         return "weekday"
-    if extract_month(question):
+    if feats.month_info:
         return "month"
     return "all_events"
 
@@ -167,7 +306,9 @@ def q_classes_start(term: str) -> Tuple[str, Dict[str, Any]]:
       toString(e.start_date) AS start_date,
       toString(e.end_date)   AS end_date,
       e.start_weekday        AS weekday,
-      e.source               AS source
+      e.source               AS source,
+      "- Event '" + e.name + "' on " + toString(e.start_date)
+        + " (weekday " + e.start_weekday + "), end date " + toString(e.end_date) + "." AS line
     """
     return q, {"term": term}
 
@@ -185,7 +326,9 @@ def q_after_anchor(term: str, anchor: str) -> Tuple[str, Dict[str, Any]]:
       toString(e.start_date) AS start_date,
       toString(e.end_date)   AS end_date,
       e.start_weekday        AS weekday,
-      e.source               AS source
+      e.source               AS source,
+      "- '" + e.name + "' from " + toString(e.start_date) + " to " + toString(e.end_date)
+        + " (weekday " + e.start_weekday + ")." AS line
     ORDER BY e.start_date
     """
     return q, {"term": term, "anchor": anchor}
@@ -204,7 +347,9 @@ def q_before_anchor(term: str, anchor: str) -> Tuple[str, Dict[str, Any]]:
       toString(e.start_date) AS start_date,
       toString(e.end_date)   AS end_date,
       e.start_weekday        AS weekday,
-      e.source               AS source
+      e.source               AS source,
+      "- '" + e.name + "' from " + toString(e.start_date) + " to " + toString(e.end_date)
+        + " (weekday " + e.start_weekday + ")." AS line
     ORDER BY e.start_date
     """
     return q, {"term": term, "anchor": anchor}
@@ -218,7 +363,9 @@ def q_weekday(term: str, weekday: str) -> Tuple[str, Dict[str, Any]]:
       e.name                 AS name,
       toString(e.start_date) AS start_date,
       toString(e.end_date)   AS end_date,
-      e.source               AS source
+      e.source               AS source,
+      "- '" + e.name + "' on " + toString(e.start_date)
+        + " (ends " + toString(e.end_date) + ")." AS line
     ORDER BY e.start_date
     """
     return q, {"term": term, "weekday": weekday}
@@ -226,60 +373,79 @@ def q_weekday(term: str, weekday: str) -> Tuple[str, Dict[str, Any]]:
 
 def q_month(term: str, year: int, month: int) -> Tuple[str, Dict[str, Any]]:
     """
-    Events in a given year-month window: [start, next_month_start)
+    Events in a given year-month window: [start, next_month_start),
+    with both bounds computed by Cypher date arithmetic.
     """
-    if month == 12:
-        next_year, next_month = year + 1, 1
-    else:
-        next_year, next_month = year, month + 1
-
-    start = f"{year:04d}-{month:02d}-01"
-    end = f"{next_year:04d}-{next_month:02d}-01"
-
     q = """
     MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
-    WHERE e.start_date >= date($start)
-      AND e.start_date <  date($end)
+    WHERE e.start_date >= date({year: $year, month: $month, day: 1})
+      AND e.start_date <  date({year: $year, month: $month, day: 1}) + duration({months: 1})
     RETURN
       e.name                 AS name,
       toString(e.start_date) AS start_date,
       toString(e.end_date)   AS end_date,
       e.start_weekday        AS weekday,
-      e.source               AS source
+      e.source               AS source,
+      "- '" + e.name + "' on " + toString(e.start_date) + " (ends " + toString(e.end_date)
+        + ", weekday " + e.start_weekday + ")." AS line
     ORDER BY e.start_date
     """
-    return q, {"term": term, "start": start, "end": end}
+    return q, {"term": term, "year": year, "month": month}
 
 
 def q_overlaps(term: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Collect the term's distinct events once and test each unordered pair in
+    that list, instead of a second MATCH self-join. This saves the join, not
+    comparisons: every pair is still tested. Each pair is oriented by id
+    (event1 has the lower id), as in the self-join.
+    """
     q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(a:Event),
-          (:Term {name:$term})-[:HAS_EVENT]->(b:Event)
-    WHERE a.start_date <= b.end_date
-      AND b.start_date <= a.end_date
-      AND id(a) < id(b)
+    MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+    WHERE e.start_date IS NOT NULL AND e.end_date IS NOT NULL
+    WITH collect(DISTINCT e) AS es
+    UNWIND range(0, size(es) - 2) AS i
+    WITH es, i, es[i] AS x
+    UNWIND [j IN range(i + 1, size(es) - 1)
+            WHERE es[j].start_date <= x.end_date
+              AND x.start_date <= es[j].end_date] AS j
+    WITH x, es[j] AS y
+    WITH CASE WHEN id(x) < id(y) THEN x ELSE y END AS a,
+         CASE WHEN id(x) < id(y) THEN y ELSE x END AS b
     RETURN
       a.name                 AS event1,
       toString(a.start_date) AS a_start,
       toString(a.end_date)   AS a_end,
       b.name                 AS event2,
       toString(b.start_date) AS b_start,
-      toString(b.end_date)   AS b_end
+      toString(b.end_date)   AS b_end,
+      "- '" + a.name + "' (" + toString(a.start_date) + "–" + toString(a.end_date)
+        + ") overlaps with '" + b.name + "' (" + toString(b.start_date) + "–"
+        + toString(b.end_date) + ")." AS line
     ORDER BY a_start, b_start
     """
     return q, {"term": term}
 
 
 def q_same_day(term: str) -> Tuple[str, Dict[str, Any]]:
+    """
+    Group the term's distinct events by start date and pair up members of
+    each group.
+    """
     q = """
-    MATCH (:Term {name:$term})-[:HAS_EVENT]->(a:Event),
-          (:Term {name:$term})-[:HAS_EVENT]->(b:Event)
-    WHERE a.start_date = b.start_date
-      AND id(a) < id(b)
+    MATCH (:Term {name:$term})-[:HAS_EVENT]->(e:Event)
+    WHERE e.start_date IS NOT NULL
+    WITH e ORDER BY id(e)
+    WITH e.start_date AS d, collect(DISTINCT e) AS es
+    WHERE size(es) > 1
+    UNWIND range(0, size(es) - 2) AS i
+    UNWIND range(i + 1, size(es) - 1) AS j
     RETURN
-      a.name                 AS event1,
-      b.name                 AS event2,
-      toString(a.start_date) AS date
+      es[i].name             AS event1,
+      es[j].name             AS event2,
+      toString(d)            AS date,
+      "- On " + toString(d) + ", '" + es[i].name + "' and '" + es[j].name
+        + "' occur on the same day." AS line
     ORDER BY date
     """
     return q, {"term": term}
@@ -293,59 +459,132 @@ def q_all_events(term: str) -> Tuple[str, Dict[str, Any]]:
       toString(e.start_date) AS start_date,
       toString(e.end_date)   AS end_date,
       e.start_weekday        AS weekday,
-      e.source               AS source
+      e.source               AS source,
+      "- '" + e.name + "' from " + toString(e.start_date) + " to " + toString(e.end_date)
+        + " (weekday " + e.start_weekday + ")." AS line
     ORDER BY e.start_date
     """
     return q, {"term": term}
 
 
+# ---------- INTENT DISPATCH ----------
+# Each handler gets the term plus the parsed context and returns
+# (cypher, params, mode_description).
+IntentHandler = Callable[[str, Dict[str, Any]], Tuple[str, Dict[str, Any], str]]
+
+
+def _h_classes_start(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    cy, p = q_classes_start(term)
+    return cy, p, f"Classes start date for {term}"
+
+
+def _h_after_anchor(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    cy, p = q_after_anchor(term, ctx["anchor"])
+    return cy, p, f"Events in {term} after '{ctx['anchor']}'"
+
+
+def _h_before_anchor(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    cy, p = q_before_anchor(term, ctx["anchor"])
+    return cy, p, f"Events in {term} before '{ctx['anchor']}'"
+
+
+def _h_weekday(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    cy, p = q_weekday(term, ctx["weekday"])
+    return cy, p, f"{ctx['weekday']} events in {term}"
+
+
+def _h_month(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    year, month = ctx["month_info"]
+    cy, p = q_month(term, year, month)
+    return cy, p, f"Events in {term} during {year}-{month:02d}"
+
+
+def _h_overlaps(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    cy, p = q_overlaps(term)
+    return cy, p, f"Overlapping events in {term}"
+
+
+def _h_same_day(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    cy, p = q_same_day(term)
+    return cy, p, f"Same-day event pairs in {term}"
+
+
+def _h_all_events(term: str, ctx: Dict[str, Any]) -> Tuple[str, Dict[str, Any], str]:
+    cy, p = q_all_events(term)
+    return cy, p, f"All events in {term}"
+
+
+# intent -> (handler, context keys that must be non-empty for it to apply)
+_INTENT_HANDLERS: Dict[str, Tuple[IntentHandler, Tuple[str, ...]]] = {
+    "classes_start": (_h_classes_start, ()),
+    "after_anchor":  (_h_after_anchor,  ("anchor",)),
+    "before_anchor": (_h_before_anchor, ("anchor",)),
+    "weekday":       (_h_weekday,       ("weekday",)),
+    "month":         (_h_month,         ("month_info",)),
+    "overlaps":      (_h_overlaps,      ()),
+    "same_day":      (_h_same_day,      ()),
+}
+
+
 def build_query_from_question(question: str) -> Tuple[str, Dict[str, Any], str, str, str]:
     """
     Decide which Cypher template to use, based on the question text.
 
     Returns (cypher, params, mode_description, intent, term).
     """
-    term = extract_term(question) or "Fall 2025"
-    intent = classify_intent(question)
-    anchor = detect_anchor(question)
-    wd = extract_weekday(question)
-    month_info = extract_month(question)
+    feats = parse_question(question)
+    term = feats.term or "Fall 2025"
+    intent = classify_intent(question, feats)
+    ctx = feats._asdict()
+
+    handler, required = _INTENT_HANDLERS.get(intent, (None, ()))
+    if handler is None or not all(ctx[k] for k in required):
+        # Default: list all events
+        handler, intent = _h_all_events, "all_events"
+    cy, p, desc = handler(term, ctx)
+    return cy, p, desc, intent, term
 
-    if intent == "classes_start":
-        cy, p = q_classes_start(term)
-        return cy, p, f"Classes start date for {term}", intent, term
 
-    if intent == "after_anchor" and anchor:
-        cy, p = q_after_anchor(term, anchor)
-        return cy, p, f"Events in {term} after '{anchor}'", intent, term
+# ---------- BUILD FACTUAL SUMMARY FROM ROWS ----------
+# The query templates return each row pre-formatted in a `line` column.
+# These per-intent formatters produce the same text in Python and are only
+# used when `line` is missing (e.g. a property was null, which nulls the
+# whole Cypher string). Each unpacks its fields with one map(r.get, ...).
+_EVENT_FIELDS = ("name", "start_date", "end_date", "weekday")
+_OVERLAP_FIELDS = ("event1", "a_start", "a_end", "event2", "b_start", "b_end")
+_SAME_DAY_FIELDS = ("date", "event1", "event2")
 
-    if intent == "before_anchor" and anchor:
-        cy, p = q_before_anchor(term, anchor)
-        return cy, p, f"Events in {term} before '{anchor}'", intent, term
 
-    if intent == "weekday" and wd:
-        cy, p = q_weekday(term, wd)
-        return cy, p, f"{wd} events in {term}", intent, term
+def _fmt_classes_start(r: Dict[str, Any]) -> str:
+    name, sd, ed, wd = map(r.get, _EVENT_FIELDS)
+    return f"- Event '{name}' on {sd} (weekday {wd}), end date {ed}."
 
-    if intent == "month" and month_info:
-        year, month = month_info
-        cy, p = q_month(term, year, month)
-        return cy, p, f"Events in {term} during {year}-{month:02d}", intent, term
 
-    if intent == "overlaps":
-        cy, p = q_overlaps(term)
-        return cy, p, f"Overlapping events in {term}", intent, term
+def _fmt_span(r: Dict[str, Any]) -> str:
+    name, sd, ed, wd = map(r.get, _EVENT_FIELDS)
+    return f"- '{name}' from {sd} to {ed} (weekday {wd})."
 
-    if intent == "same_day":
-        cy, p = q_same_day(term)
-        return cy, p, f"Same-day event pairs in {term}", intent, term
 
-    # Default: list all events
-    cy, p = q_all_events(term)
-    return cy, p, f"All events in {term}", "all_events", term
+def _fmt_weekday(r: Dict[str, Any]) -> str:
+    name, sd, ed, _ = map(r.get, _EVENT_FIELDS)
+    return f"- '{name}' on {sd} (ends {ed})."
+
+
+def _fmt_month(r: Dict[str, Any]) -> str:
+    name, sd, ed, wd = map(r.get, _EVENT_FIELDS)
+    return f"- '{name}' on {sd} (ends {ed}, weekday {wd})."
+
+
+def _fmt_overlap(r: Dict[str, Any]) -> str:
+    e1, a_start, a_end, e2, b_start, b_end = map(r.get, _OVERLAP_FIELDS)
+    return f"- '{e1}' ({a_start}–{a_end}) overlaps with '{e2}' ({b_start}–{b_end})."
+
+
+def _fmt_same_day(r: Dict[str, Any]) -> str:
+    d, e1, e2 = map(r.get, _SAME_DAY_FIELDS)
+    return f"- On {d}, '{e1}' and '{e2}' occur on the same day."
 
 
-# ---------- BUILD FACTUAL SUMMARY FROM ROWS ----------
 def build_factual_summary(
     question: str,
     intent: str,
@@ -361,86 +600,156 @@ def build_factual_summary(
         return f"There are 0 matching events in the data for the question: {question}"
 
     # For some intents we might want extra context
-    anchor = detect_anchor(question)
-    wd = extract_weekday(question)
-    month_info = extract_month(question)
-
-    lines: List[str] = []
+    feats = parse_question(question)
+    anchor, wd, month_info = feats.anchor, feats.weekday, feats.month_info
 
     if intent == "classes_start":
-        lines.append(f"There are {n} 'Classes Begin' event row(s) for {term}:")
-        for r in rows:
-            lines.append(
-                f"- Event '{r.get('name')}' on {r.get('start_date')} "
-                f"(weekday {r.get('weekday')}), end date {r.get('end_date')}."
-            )
+        header = f"There are {n} 'Classes Begin' event row(s) for {term}:"
+        fmt = _fmt_classes_start
 
     elif intent in ("after_anchor", "before_anchor") and anchor:
         direction = "after" if intent == "after_anchor" else "before"
-        lines.append(
-            f"There are {n} event row(s) in {term} that occur {direction} the anchor event '{anchor}':"
-        )
-        for r in rows:
-            lines.append(
-                f"- '{r.get('name')}' from {r.get('start_date')} to {r.get('end_date')} "
-                f"(weekday {r.get('weekday')})."
-            )
+        header = f"There are {n} event row(s) in {term} that occur {direction} the anchor event '{anchor}':"
+        fmt = _fmt_span
 
     elif intent == "weekday" and wd:
-        lines.append(f"There are {n} event row(s) in {term} that start on {wd}:")
-        for r in rows:
-            lines.append(
-                f"- '{r.get('name')}' on {r.get('start_date')} (ends {r.get('end_date')})."
-            )
+        header = f"There are {n} event row(s) in {term} that start on {wd}:"
+        fmt = _fmt_weekday
 
     elif intent == "month" and month_info:
         year, month = month_info
-        lines.append(
-            f"There are {n} event row(s) in {term} during {year}-{month:02d}:"
-        )
-        for r in rows:
-            lines.append(
-                f"- '{r.get('name')}' on {r.get('start_date')} (ends {r.get('end_date')}, weekday {r.get('weekday')})."
-            )
+        header = f"There are {n} event row(s) in {term} during {year}-{month:02d}:"
+        fmt = _fmt_month
 
     elif intent == "overlaps":
-        lines.append(f"There are {n} overlapping event pair row(s) in {term}:")
-        for r in rows:
-            lines.append(
-                f"- '{r.get('event1')}' ({r.get('a_start')}–{r.get('a_end')}) "
-                f"overlaps with '{r.get('event2')}' ({r.get('b_start')}–{r.get('b_end')})."
-            )
+        header = f"There are {n} overlapping event pair row(s) in {term}:"
+        fmt = _fmt_overlap
 
     elif intent == "same_day":
-        lines.append(f"There are {n} same-day event pair row(s) in {term}:")
-        for r in rows:
-            lines.append(
-                f"- On {r.get('date')}, '{r.get('event1')}' and '{r.get('event2')}' occur on the same day."
-            )
+        header = f"There are {n} same-day event pair row(s) in {term}:"
+        fmt = _fmt_same_day
 
     else:
         # all_events or unknown intent → list all events
-        lines.append(f"There are {n} event row(s) for {term} in total:")
-        for r in rows:
-            lines.append(
-                f"- '{r.get('name')}' from {r.get('start_date')} to {r.get('end_date')} "
-                f"(weekday {r.get('weekday')})."
-            )
+        header = f"There are {n} event row(s) for {term} in total:"
+        fmt = _fmt_span
+
+    return header + "\n" + "\n".join(r.get("line") or fmt(r) for r in rows)
+
+
+def _display_rows(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Rows without the pre-formatted `line` column, for table output."""
+    return [{k: v for k, v in r.items() if k != "line"} for r in rows]
+
+
+# ---------- REWRITE CACHE ----------
+# The factual summary is built deterministically from the rows, so equivalent
+# questions produce the same summary. Cache the rewrite per (model, temperature,
+# summary) in SQLite so repeats skip the LLM entirely; the most recent entries
+# are also kept in a small in-memory LRU in front of it.
+_REWRITE_MEMO: "OrderedDict[str, str]" = OrderedDict()
+_REWRITE_MEMO_MAXSIZE = 1024
+_REWRITE_MEMO_LOCK = threading.Lock()
 
-    return "\n".join(lines)
+
+def _rewrite_key(model: str, temperature: float, summary: str) -> str:
+    # _PROMPT_VERSION (defined with the prompts below) retires entries when the prompt changes
+    key = f"{_PROMPT_VERSION}|{model}|{temperature}|{summary}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _memo_put(key: str, answer: str) -> None:
+    with _REWRITE_MEMO_LOCK:
+        _REWRITE_MEMO[key] = answer
+        _REWRITE_MEMO.move_to_end(key)
+        while len(_REWRITE_MEMO) > _REWRITE_MEMO_MAXSIZE:
+            _REWRITE_MEMO.popitem(last=False)
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _REWRITE_MEMO_LOCK:
+        if key in _REWRITE_MEMO:
+            _REWRITE_MEMO.move_to_end(key)
+            return _REWRITE_MEMO[key]
+    if not LLM_CACHE_PATH:
+        return None
+    try:
+        with closing(sqlite3.connect(LLM_CACHE_PATH)) as db:
+            row = db.execute("SELECT answer FROM rewrites WHERE key = ?", (key,)).fetchone()
+    except sqlite3.Error:
+        # no cache file / table yet
+        return None
+    if row is None:
+        return None
+    _memo_put(key, row[0])
+    return row[0]
+
+
+def _cache_put(key: str, answer: str) -> None:
+    _memo_put(key, answer)
+    if not LLM_CACHE_PATH:
+        return
+    try:
+        Path(LLM_CACHE_PATH).parent.mkdir(parents=True, exist_ok=True)
+        with closing(sqlite3.connect(LLM_CACHE_PATH)) as db, db:
+            db.execute("CREATE TABLE IF NOT EXISTS rewrites (key TEXT PRIMARY KEY, answer TEXT)")
+            db.execute("INSERT OR REPLACE INTO rewrites VALUES (?, ?)", (key, answer))
+    except (OSError, sqlite3.Error):
+        pass
 
 
 # ---------- ANSWER FROM ROWS (LLM AS REWRITER) ----------
+# For these intents a short summary is already the answer; a rewrite would only
+# add latency, so it is returned as-is.
+DIRECT_ANSWER_INTENTS = {"classes_start", "month", "weekday"}
+DIRECT_ANSWER_MAX_ROWS = 3
+
+# The instructions are a fixed prefix, identical on every call, so Ollama can reuse
+# its prompt cache for them; only the tail varies per question.
+REWRITE_RULES = (
+    "You are a precise assistant. I will give you:\n"
+    "- a user question,\n"
+    "- a plain factual summary that is already CORRECT, and\n"
+    "- the raw table rows from Neo4j.\n\n"
+    "Your job is ONLY to rewrite the factual summary into a clearer, more natural answer.\n"
+    "VERY IMPORTANT RULES:\n"
+    "1) Do NOT change any facts, numbers, dates, weekdays, or names.\n"
+    "2) Do NOT contradict the summary (for example, if it says there are 4 events, "
+    "you must not say there are 0 events).\n"
+    "3) You may shorten or slightly rephrase sentences, but keep all the important details.\n"
+    "4) If you are unsure, just repeat the summary exactly."
+)
+
+# Sent as the user message; REWRITE_RULES goes in the system message so the
+# shared prefix stays identical from call to call.
+REWRITE_PROMPT = (
+    "MODE DESCRIPTION: {mode_desc}\n"
+    "TERM: {term}\n\n"
+    "QUESTION:\n{question}\n\n"
+    "FACTUAL SUMMARY:\n"
+    "{summary}\n\n"
+    "RAW TABLE (for your reference, do not contradict it):\n"
+    "{table_text}\n\n"
+    "Now rewrite the FACTUAL SUMMARY as a concise, clear answer "
+    "without changing any of its facts."
+)
+
+# Part of every rewrite cache key: editing either prompt invalidates old answers.
+_PROMPT_VERSION = hashlib.sha256((REWRITE_RULES + REWRITE_PROMPT).encode("utf-8")).hexdigest()[:16]
+
+
 def answer_from_rows(
     question: str,
     rows: List[Dict[str, Any]],
     mode_desc: str,
     intent: str,
     term: str,
+    on_chunk: Optional[Callable[[str], None]] = None,
 ) -> str:
     """
     Use Neo4j rows to build a factual summary in Python.
     Then ask the LLM to rewrite that summary WITHOUT changing any facts.
+    `on_chunk` receives the rewrite incrementally while it streams.
     """
     if not rows:
         # If there are no rows at all, it's safe to say "nothing found".
@@ -448,46 +757,92 @@ def answer_from_rows(
 
     # Build factual summary
     summary = build_factual_summary(question, intent, term, rows)
-
-    # Optional: table just for debugging / more transparency if needed
-    headers = list(rows[0].keys())
+    if intent in DIRECT_ANSWER_INTENTS and len(rows) <= DIRECT_ANSWER_MAX_ROWS:
+        return summary
+
+    temperature = 0.1
+    cache_key = _rewrite_key(OLLAMA_MODEL, temperature, summary)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Optional: table just for debugging / more transparency if needed.
+    # tabulate reads the list of dicts directly; no per-cell reshaping needed.
+    table_rows = _display_rows(rows)
     if HAVE_TABULATE:
-        table_text = tabulate(rows, headers="keys")
+        table_text = tabulate(table_rows, headers="keys")
     else:
-        table_text = json.dumps(rows, indent=2, default=str)
-
-    prompt = (
-        "You are a precise assistant. I will give you:\n"
-        "- a user question,\n"
-        "- a plain factual summary that is already CORRECT, and\n"
-        "- the raw table rows from Neo4j.\n\n"
-        "Your job is ONLY to rewrite the factual summary into a clearer, more natural answer.\n"
-        "VERY IMPORTANT RULES:\n"
-        "1) Do NOT change any facts, numbers, dates, weekdays, or names.\n"
-        "2) Do NOT contradict the summary (for example, if it says there are 4 events, "
-        "you must not say there are 0 events).\n"
-        "3) You may shorten or slightly rephrase sentences, but keep all the important details.\n"
-        "4) If you are unsure, just repeat the summary exactly.\n\n"
-        f"MODE DESCRIPTION: {mode_desc}\n"
-        f"TERM: {term}\n\n"
-        f"QUESTION:\n{question}\n\n"
-        "FACTUAL SUMMARY:\n"
-        f"{summary}\n\n"
-        "RAW TABLE (for your reference, do not contradict it):\n"
-        f"{table_text}\n\n"
-        "Now rewrite the FACTUAL SUMMARY as a concise, clear answer "
-        "without changing any of its facts."
+        table_text = json.dumps(table_rows, indent=2, default=str)
+
+    prompt = REWRITE_PROMPT.format(
+        mode_desc=mode_desc,
+        term=term,
+        question=question,
+        summary=summary,
+        table_text=table_text,
+    )
+
+    # the rewrite is roughly as long as the summary: cap generation accordingly
+    answer, done = call_ollama(
+        prompt,
+        temperature=temperature,
+        on_chunk=on_chunk,
+        num_predict=max(128, 40 * len(rows)),
+        system=REWRITE_RULES,
     )
+    if not answer:
+        # error line or empty stream: fall back to the factual summary itself
+        return summary
+    if done:
+        # only complete rewrites are cached; a truncated one would be served forever
+        _cache_put(cache_key, answer)
+    return answer
 
-    return call_ollama(prompt, temperature=0.1).strip()
+
+# ---------- BATCH MODE ----------
+def answer_many(questions: List[str], max_workers: int = 8) -> List[str]:
+    """
+    Answer many questions at once: every Cypher query runs in a single read
+    transaction, then the LLM rewrites are sent to Ollama concurrently
+    (it batches parallel requests). Answers come back in input order.
+    """
+    plans = [build_query_from_question(q) for q in questions]
+    results = run_cypher_many([(cypher, params) for cypher, params, *_ in plans])
+
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = [
+            ex.submit(
+                answer_from_rows,
+                question=q,
+                rows=rows,
+                mode_desc=desc,
+                intent=intent,
+                term=term,
+            )
+            for q, rows, (_, _, desc, intent, term) in zip(questions, results, plans)
+        ]
+        return [f.result() for f in futures]
 
 
 # ---------- MAIN CLI ----------
 def main():
     if len(sys.argv) < 2:
         print('Usage: python neo4j_qa.py "Your question here"')
+        print('       python neo4j_qa.py --batch questions.txt   (one question per line)')
         sys.exit(1)
 
+    if sys.argv[1] == "--batch":
+        if len(sys.argv) < 3:
+            print("--batch needs a file with one question per line")
+            sys.exit(1)
+        with open(sys.argv[2], encoding="utf-8") as f:
+            questions = [line.strip() for line in f if line.strip()]
+        for q, answer in zip(questions, answer_many(questions)):
+            print(f"QUESTION: {q}")
+            print(answer)
+            print("====================")
+        return
+
     question = " ".join(sys.argv[1:]).strip()
     print(f"QUESTION: {question}\n")
 
@@ -513,24 +868,36 @@ def main():
     if rows:
         print(f"--- RAW ROWS ({len(rows)}) ---")
         if HAVE_TABULATE:
-            print(tabulate(rows, headers="keys"))
+            print(tabulate(_display_rows(rows), headers="keys"))
         else:
-            print(json.dumps(rows, indent=2, default=str))
+            print(json.dumps(_display_rows(rows), indent=2, default=str))
     else:
         print("--- RAW ROWS (0) ---")
     print("---------------------\n")
 
-    # Use LLM as rewriter of our factual summary
+    # Use LLM as rewriter of our factual summary, printing tokens as they arrive
+    print("=== FINAL ANSWER ===")
+    streamed = False
+
+    def echo(chunk: str) -> None:
+        nonlocal streamed
+        streamed = True
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+
     final = answer_from_rows(
         question=question,
         rows=rows,
         mode_desc=desc,
         intent=intent,
         term=term,
+        on_chunk=echo,
     )
 
-    print("=== FINAL ANSWER ===")
-    print(final)
+    if streamed:
+        print()
+    else:
+        print(final)
     print("====================")
 
 
@@ -11,3 +11,6 @@ FOR (e:Event) ON (e.start_date);
 
 CREATE INDEX event_end_date_index IF NOT EXISTS
 FOR (e:Event) ON (e.end_date);
+
+CREATE INDEX event_start_weekday_index IF NOT EXISTS
+FOR (e:Event) ON (e.start_weekday);
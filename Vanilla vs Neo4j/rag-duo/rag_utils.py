@@ -1,45 +1,106 @@
 from __future__ import annotations
 
+import atexit
 import json
+import os
+import threading
 import requests
-from typing import List
-from sentence_transformers import SentenceTransformer
+from requests.adapters import HTTPAdapter
+from typing import Iterator, List
 
-# Embeddings (CPU)
-_ST_MODEL = SentenceTransformer("all-MiniLM-L6-v2")  # 384-dim
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
 
+# both parsers take bytes; json.JSONDecodeError below also covers orjson's error
+_json_loads = orjson.loads if HAVE_ORJSON else json.loads
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
+# Embeddings (CPU). Loaded on first use so generate-only callers never pay for
+# importing torch and loading the model.
+# EMBED_BACKEND=onnx-int8 swaps in the dynamically quantized ONNX export shipped
+# with the model (needs `sentence-transformers[onnx]`). Ingest and query must use
+# the same backend, otherwise stored and query vectors won't line up.
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+_ST_MODEL = None
+_ST_LOCK = threading.Lock()
+
+
+def _get_model():
+    global _ST_MODEL
+    if _ST_MODEL is None:
+        with _ST_LOCK:
+            if _ST_MODEL is None:
+                import torch
+                from sentence_transformers import SentenceTransformer
+
+                # cap intra-op threads so small CPUs are not oversubscribed
+                torch.set_num_threads(min(4, os.cpu_count() or 1))
+                if EMBED_BACKEND == "onnx-int8":
+                    _ST_MODEL = SentenceTransformer(
+                        "all-MiniLM-L6-v2",
+                        backend="onnx",
+                        model_kwargs={
+                            "file_name": EMBED_ONNX_FILE,
+                            "provider": "CPUExecutionProvider",
+                        },
+                    )
+                else:
+                    _ST_MODEL = SentenceTransformer("all-MiniLM-L6-v2")  # 384-dim
+    return _ST_MODEL
+
+
+def embed_texts(texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> List[List[float]]:
     if isinstance(texts, str):
         texts = [texts]
-    vecs = _ST_MODEL.encode(list(texts), convert_to_numpy=True, normalize_embeddings=False)
+    vecs = _get_model().encode(
+        list(texts),
+        batch_size=batch_size,
+        show_progress_bar=show_progress_bar,
+        convert_to_numpy=True,
+        normalize_embeddings=False,
+    )
     return [v.tolist() for v in vecs]
 
 
 # Generation via Ollama
 OLLAMA_HOST = "http://localhost:11434"
 
+# Pooled keep-alive connections to Ollama, shared by every generate call.
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+atexit.register(_SESSION.close)
 
-def generate(prompt: str, model: str = "llama3.2:3b", temperature: float = 0.2, timeout: int = 600) -> str:
+
+def generate_stream(
+    prompt: str, model: str = "llama3.2:3b", temperature: float = 0.2, timeout: int = 600
+) -> Iterator[str]:
+    """Yield response chunks as Ollama produces them."""
     url = f"{OLLAMA_HOST}/api/generate"
     payload = {
         "model": model,
         "prompt": prompt,
+        "stream": True,
         "options": {"temperature": temperature},
     }
-    with requests.post(url, json=payload, stream=True, timeout=timeout) as resp:
+    with _SESSION.post(url, json=payload, stream=True, timeout=timeout) as resp:
         resp.raise_for_status()
-        out_chunks: List[str] = []
-        for line in resp.iter_lines(decode_unicode=True):
+        # parse raw bytes: no per-line str decode before the JSON parser
+        for line in resp.iter_lines(decode_unicode=False):
             if not line:
                 continue
             try:
-                msg = json.loads(line)
+                msg = _json_loads(line)
             except json.JSONDecodeError:
                 continue
             chunk = msg.get("response")
             if chunk:
-                out_chunks.append(chunk)
+                yield chunk
             if msg.get("done"):
                 break
-        return "".join(out_chunks)
+
+
+def generate(prompt: str, model: str = "llama3.2:3b", temperature: float = 0.2, timeout: int = 600) -> str:
+    return "".join(generate_stream(prompt, model=model, temperature=temperature, timeout=timeout))
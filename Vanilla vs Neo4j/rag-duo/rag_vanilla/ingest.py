@@ -8,7 +8,6 @@ sys.path.append(str(Path(__file__).resolve().parents[1]))
 import pandas as pd
 import chromadb
 from pathlib import Path
-from tqdm import tqdm
 from rag_utils import embed_texts
 
 DB_DIR = Path(__file__).parent / "store"
@@ -20,16 +19,15 @@ def _rows_to_docs(df: pd.DataFrame) -> list[str]:
     if "canon_text" in df.columns:
         return df["canon_text"].fillna("").astype(str).tolist()
 
-    def row_to_line(r):
-        term = str(r.get("Term", "")).strip()
-        ev = str(r.get("event", "")).strip()
-        sd = str(r.get("start_date", "")).strip()
-        ed = str(r.get("end_date", "")).strip()
-        src = str(r.get("source", "")).strip()
-        rng = f"{sd} to {ed}" if sd and ed and sd != ed else sd
-        return f"{term} — {ev} — {rng} — source: {src}".strip()
+    # Column-wise string ops instead of a Python loop over iterrows().
+    def col(name: str) -> pd.Series:
+        if name not in df.columns:
+            return pd.Series("", index=df.index)
+        return df[name].fillna("").astype(str).str.strip()
 
-    return [row_to_line(r) for _, r in df.iterrows()]
+    term, ev, sd, ed, src = (col(c) for c in ("Term", "event", "start_date", "end_date", "source"))
+    rng = (sd + " to " + ed).where((sd != "") & (ed != "") & (sd != ed), sd)
+    return (term + " — " + ev + " — " + rng + " — source: " + src).str.strip().tolist()
 
 
 def main():
@@ -48,13 +46,17 @@ def main():
         pass
     coll = client.create_collection(name=COLL_NAME)
 
-    BATCH = 64
-    for i in tqdm(range(0, len(docs), BATCH), desc="Embedding"):
-        batch_docs = docs[i : i + BATCH]
-        batch_ids = ids[i : i + BATCH]
-        batch_meta = metas[i : i + BATCH]
-        vecs = embed_texts(batch_docs)
-        coll.add(ids=batch_ids, documents=batch_docs, metadatas=batch_meta, embeddings=vecs)
+    # Encode the whole corpus in one call (the model batches internally), then
+    # add in as few calls as Chroma allows -- normally just one.
+    vecs = embed_texts(docs, batch_size=128, show_progress_bar=True)
+    step = client.get_max_batch_size()
+    for i in range(0, len(docs), step):
+        coll.add(
+            ids=ids[i : i + step],
+            documents=docs[i : i + step],
+            metadatas=metas[i : i + step],
+            embeddings=vecs[i : i + step],
+        )
 
     print(f"✅ Ingested {len(docs)} rows into Chroma at {DB_DIR}")
 
@@ -6,11 +6,12 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+import functools
 import re
-from datetime import datetime
+from datetime import date
 
 import chromadb
-from rag_utils import embed_texts, generate
+from rag_utils import embed_texts, generate_stream
 
 DB_DIR = Path(__file__).parent / "store"
 COLL_NAME = "events"
@@ -30,6 +31,23 @@ Answer:"""
 
 
 # -------- Utility: handle weekday/date questions deterministically --------
+# One scan finds both the ISO date (YYYY-MM-DD) and an optional "is it <weekday>".
+_UTIL_RE = re.compile(
+    r'(?P<date>(?P<y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2}))'
+    r'|\bis it\s+(?P<wd>monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b'
+)
+
+
+# indexed by date.weekday(): Monday == 0; avoids locale-aware strftime('%A')
+_WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+@functools.lru_cache(maxsize=1024)
+def _weekday_name(y: int, mm: int, dd: int) -> str:
+    """Weekday name of a date; raises ValueError if the date is invalid."""
+    return _WEEKDAYS[date(y, mm, dd).weekday()]
+
+
 def utility_answer(q: str) -> str | None:
     """
     Handles small 'tool' questions outside the CSV, like:
@@ -40,35 +58,28 @@ def utility_answer(q: str) -> str | None:
     """
     s = q.strip().lower()
 
-    # Match YYYY-MM-DD (strict ISO)
-    m = re.search(r'(\d{4})-(\d{2})-(\d{2})', s)
-    if not m:
+    ymd = asked = None
+    for m in _UTIL_RE.finditer(s):
+        if m.group('date'):
+            ymd = ymd or (int(m.group('y')), int(m.group('m')), int(m.group('d')))
+        else:
+            asked = asked or m.group('wd')
+    if ymd is None:
         return None
 
-    y, mm, dd = map(int, m.groups())
     try:
-        d = datetime(y, mm, dd)
+        weekday = _weekday_name(*ymd)  # e.g., 'Thursday'
     except ValueError:
         return "That date is invalid."
-
-    weekday = d.strftime('%A')  # e.g., 'Thursday'
+    iso = date(*ymd).isoformat()
 
     # If user asked a yes/no like "is it monday?"
-    yn = re.search(
-        r'\bis it\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday)\b',
-        s
-    )
-    if yn:
-        asked = yn.group(1).title()
-        verdict = "Yes" if asked == weekday else "No"
-        return f"{verdict}. {d.date().isoformat()} is a {weekday}."
-
-    # If user asked open-ended (which/what day)
-    if re.search(r'\b(which|what)\s+day\b', s) or s.endswith('?') or True:
-        # Default concise answer
-        return f"{d.date().isoformat()} is a {weekday}."
+    if asked:
+        verdict = "Yes" if asked.title() == weekday else "No"
+        return f"{verdict}. {iso} is a {weekday}."
 
-    return None
+    # Otherwise (which/what day, or just a date): concise answer
+    return f"{iso} is a {weekday}."
 
 
 # ---------------- Retrieval + Generation (Vanilla RAG) ----------------
@@ -105,8 +116,11 @@ def main():
     ctx = "\n\n---\n\n".join(h[0] for h in hits)
     prompt = TEMPLATE.format(q=q, ctx=ctx)
 
-    answer = generate(prompt, model="llama3.2:3b", temperature=0.2)
-    print(answer)
+    # Print tokens as they arrive instead of waiting for the full answer
+    for chunk in generate_stream(prompt, model="llama3.2:3b", temperature=0.2):
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+    print()
 
 
 if __name__ == "__main__":
@@ -11,7 +11,13 @@ import csv
 from pathlib import Path
 from typing import List, Tuple, Optional
 import requests
-from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml  # noqa: F401  C-backed tree builder for BeautifulSoup
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
 # -----------------------
 # Config
@@ -46,11 +52,15 @@ MONTH_MAP = {
 MONTH_PATTERN = r"(?:Jan\.?|January|Feb\.?|February|Mar\.?|March|Apr\.?|April|May|Jun\.?|June|Jul\.?|July|Aug\.?|August|Sep\.?|Sept\.?|September|Oct\.?|October|Nov\.?|November|Dec\.?|December)"
 MD_PAIR = re.compile(rf"({MONTH_PATTERN})\s+(\d{{1,2}})")
 DOW_WORDS = {"monday","tuesday","wednesday","thursday","friday","saturday","sunday"}
+# compiled once: one scan strips every weekday word
+DOW_RE = re.compile(r"\b(?:" + "|".join(sorted(DOW_WORDS)) + r")\b")
+HEADING_RE = re.compile(r"^h[1-6]$")
+RANGE_END_DAY = re.compile(r"-\s*(\d{1,2})\b")
 
 def fetch_html(url: str) -> BeautifulSoup:
     resp = requests.get(url, headers=HEADERS, timeout=30)
     resp.raise_for_status()
-    return BeautifulSoup(resp.text, "html.parser")
+    return BeautifulSoup(resp.text, HTML_PARSER)
 
 def heading_level(tag_name: str) -> int:
     if tag_name and tag_name.lower().startswith("h") and tag_name[1:].isdigit():
@@ -59,7 +69,7 @@ def heading_level(tag_name: str) -> int:
 
 def iter_term_block(root: BeautifulSoup, term_title: str) -> List[str]:
     heading = None
-    for h in root.find_all(re.compile(r"^h[1-6]$")):
+    for h in root.find_all(HEADING_RE):
         if h.get_text(strip=True) == term_title:
             heading = h
             break
@@ -70,24 +80,24 @@ def iter_term_block(root: BeautifulSoup, term_title: str) -> List[str]:
     lines: List[str] = []
 
     for sib in heading.next_siblings:
-        if isinstance(sib, NavigableString):
+        name = getattr(sib, "name", None)
+        if name is None:
+            continue
+        if HEADING_RE.match(name):
+            if heading_level(name) <= lvl:
+                break
+        if name in ("h5", "h6", "strong"):
             continue
-        if isinstance(sib, Tag):
-            if sib.name and re.fullmatch(r"h[1-6]", sib.name):
-                if heading_level(sib.name) <= lvl:
-                    break
-            if sib.name in ("h5", "h6", "strong"):
-                continue
-            if sib.name in ("p", "div", "section"):
-                lines.extend(_extract_lines_from_block(sib))
-            elif sib.name in ("ul", "ol"):
-                for li in sib.find_all("li"):
-                    lines.extend(_extract_lines_from_block(li))
-            elif sib.name == "table":
-                for tr in sib.find_all("tr"):
-                    tds = [td.get_text(" ", strip=True) for td in tr.find_all(["td","th"])]
-                    if len(tds) >= 2:
-                        lines.append(f"{tds[0]}  {tds[1]}")
+        if name in ("p", "div", "section"):
+            lines.extend(_extract_lines_from_block(sib))
+        elif name in ("ul", "ol"):
+            for li in sib.find_all("li"):
+                lines.extend(_extract_lines_from_block(li))
+        elif name == "table":
+            for tr in sib.find_all("tr"):
+                tds = [td.get_text(" ", strip=True) for td in tr.find_all(["td","th"])]
+                if len(tds) >= 2:
+                    lines.append(f"{tds[0]}  {tds[1]}")
 
     clean = []
     seen = set()
@@ -107,14 +117,16 @@ def _extract_lines_from_block(tag: Tag) -> List[str]:
         parts = []
         curr = []
         for elem in tag.children:
-            if isinstance(elem, NavigableString):
+            # strings have name None, tags their tag name: cheaper than isinstance
+            name = getattr(elem, "name", None)
+            if name is None:
                 curr.append(str(elem))
-            elif isinstance(elem, Tag) and elem.name == "br":
+            elif name == "br":
                 part = " ".join("".join(curr).split())
                 if part:
                     parts.append(part)
                 curr = []
-            elif isinstance(elem, Tag):
+            else:
                 curr.append(elem.get_text(" ", strip=True))
         last = " ".join("".join(curr).split())
         if last:
@@ -140,20 +152,22 @@ def normalize_date_chunk(date_chunk: str, default_year: int) -> str:
          .replace("–", "-")
          .replace("—", "-"))
     low = s.lower()
-    for w in DOW_WORDS:
-        low = re.sub(rf"\b{w}\b", "", low)
+    low = DOW_RE.sub("", low)
     s = " ".join(low.split())
 
-    pairs = MD_PAIR.findall(s)
-    if len(pairs) >= 2:
-        (m1, d1), (m2, d2) = pairs[0], pairs[1]
+    # one scan: at most two month/day pairs are needed
+    pairs = MD_PAIR.finditer(s)
+    first = next(pairs, None)
+    second = next(pairs, None)
+    if second is not None:
+        (m1, d1), (m2, d2) = first.groups(), second.groups()
         start = _fmt(int(MONTH_MAP[m1]), int(d1), default_year)
         end   = _fmt(int(MONTH_MAP[m2]), int(d2), default_year)
         return f"{start} to {end}"
-    elif len(pairs) == 1:
-        (m1, d1) = pairs[0]
-        after = s[MD_PAIR.search(s).end():]
-        m2day = re.search(r"-\s*(\d{1,2})\b", after)
+    elif first is not None:
+        (m1, d1) = first.groups()
+        # range end day ("Aug 13-15"), searched from where the pair ended
+        m2day = RANGE_END_DAY.search(s, first.end())
         if m2day:
             start = _fmt(int(MONTH_MAP[m1]), int(d1), default_year)
             end   = _fmt(int(MONTH_MAP[m1]), int(m2day.group(1)), default_year)
@@ -185,13 +199,13 @@ def main():
     soup = fetch_html(SOURCE_URL)
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
+    # 1 MiB buffer: the whole file goes out in a handful of write() calls
+    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
         writer = csv.writer(f)
         writer.writerow(["Term", "event", "date", "source"])
         for term_title, year in TERMS:
             rows = extract_term_rows(soup, term_title, year)
-            for event, date_str in rows:
-                writer.writerow([term_title, event, date_str, SOURCE_URL])
+            writer.writerows((term_title, event, date_str, SOURCE_URL) for event, date_str in rows)
 
     print(f"[ETL] Wrote {OUTPUT_CSV.resolve()}")
 
@@ -8,6 +8,7 @@ What it does:
 3) Import into Neo4j (choose one)
    A) Direct insert via Neo4j driver (recommended)
    B) LOAD CSV from Neo4j Desktop 'import' folder (requires you pass that path)
+   C) Offline bulk load with neo4j-admin database import (initial loads only)
 
 USAGE (Recommended - Option A):
   python etl_and_import.py --method driver \
@@ -22,20 +23,50 @@ USAGE (Option B: LOAD CSV):
       --user neo4j --password your_password \
       --db neo4j
 
+USAGE (Option C: offline bulk load with neo4j-admin; the database must be stopped):
+  python etl_and_import.py --method admin --db neo4j
+  (add --admin-overwrite to replace a database that already has a store)
+
 Prereqs:
   pip install requests beautifulsoup4 neo4j
+  pip install lxml   # optional, faster HTML parsing
+  pip install requests-cache   # optional, caches the calendar page for an hour
 """
 
 import argparse
+import atexit
 import csv
+import gzip
 import os
 import re
+import shutil
+import subprocess
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Optional
 
 import requests
-from bs4 import BeautifulSoup, NavigableString, Tag
-from neo4j import GraphDatabase
+from bs4 import BeautifulSoup, Tag
+
+try:
+    import lxml  # noqa: F401  C-backed tree builder for BeautifulSoup
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+try:
+    import requests_cache
+    HAVE_REQUESTS_CACHE = True
+except ImportError:
+    HAVE_REQUESTS_CACHE = False
+from neo4j import GraphDatabase, WRITE_ACCESS
+
+# default rows per write transaction when importing via the driver (--batch-size)
+BATCH_SIZE = 20_000
+# parallel write sessions for the driver path (--workers)
+WORKERS = min(8, os.cpu_count() or 1)
+# candidate sizes probed by --auto-tune-batch
+AUTO_TUNE_SIZES = (5_000, 10_000, 20_000, 40_000)
 
 SOURCE_URL = "https://reg.uga.edu/general-information/calendars/academic-calendars/"
 TERMS = [
@@ -62,12 +93,22 @@ MONTH_MAP = {
 MONTH_PATTERN = r"(?:Jan\.?|January|Feb\.?|February|Mar\.?|March|Apr\.?|April|May|Jun\.?|June|Jul\.?|July|Aug\.?|August|Sep\.?|Sept\.?|September|Oct\.?|October|Nov\.?|November|Dec\.?|December)"
 MD_PAIR = re.compile(rf"({MONTH_PATTERN})\s+(\d{{1,2}})")
 DOW_WORDS = {"monday","tuesday","wednesday","thursday","friday","saturday","sunday"}
+# compiled once: one scan strips every weekday word
+DOW_RE = re.compile(r"\b(?:" + "|".join(sorted(DOW_WORDS)) + r")\b")
+HEADING_RE = re.compile(r"^h[1-6]$")
+RANGE_END_DAY = re.compile(r"-\s*(\d{1,2})\b")
 
-def fetch_html(url: str) -> BeautifulSoup:
+def fetch_html(url: str, use_cache: bool = True) -> BeautifulSoup:
     hdrs = {"User-Agent": "Mozilla/5.0 (ETL/1.0)"}
-    r = requests.get(url, headers=hdrs, timeout=30)
+    if use_cache and HAVE_REQUESTS_CACHE:
+        # sqlite-backed, honours Cache-Control/ETag; re-runs within an hour skip the network
+        with requests_cache.CachedSession(".cache/scrape", backend="sqlite",
+                                          expire_after=3600, cache_control=True) as session:
+            r = session.get(url, headers=hdrs, timeout=30)
+    else:
+        r = requests.get(url, headers=hdrs, timeout=30)
     r.raise_for_status()
-    return BeautifulSoup(r.text, "html.parser")
+    return BeautifulSoup(r.text, HTML_PARSER)
 
 def heading_level(tag_name: str) -> int:
     if tag_name and tag_name.lower().startswith("h") and tag_name[1:].isdigit():
@@ -79,14 +120,16 @@ def _extract_lines_from_block(tag: Tag) -> List[str]:
         parts = []
         curr = []
         for elem in tag.children:
-            if isinstance(elem, NavigableString):
+            # strings have name None, tags their tag name: cheaper than isinstance
+            name = getattr(elem, "name", None)
+            if name is None:
                 curr.append(str(elem))
-            elif isinstance(elem, Tag) and elem.name == "br":
+            elif name == "br":
                 part = " ".join("".join(curr).split())
                 if part:
                     parts.append(part)
                 curr = []
-            elif isinstance(elem, Tag):
+            else:
                 curr.append(elem.get_text(" ", strip=True))
         last = " ".join("".join(curr).split())
         if last:
@@ -96,35 +139,41 @@ def _extract_lines_from_block(tag: Tag) -> List[str]:
         txt = tag.get_text(" ", strip=True)
         return [txt] if txt else []
 
-def iter_term_block(root: BeautifulSoup, term_title: str) -> List[str]:
-    heading = None
-    for h in root.find_all(re.compile(r"^h[1-6]$")):
-        if h.get_text(strip=True) == term_title:
-            heading = h
-            break
+def index_term_headings(root: BeautifulSoup) -> Dict[str, Tag]:
+    """Map heading text -> first heading with that text, in one pass over the page."""
+    headings: Dict[str, Tag] = {}
+    for h in root.find_all(HEADING_RE):
+        headings.setdefault(h.get_text(strip=True), h)
+    return headings
+
+def iter_term_block(root: BeautifulSoup, term_title: str,
+                    headings: Optional[Dict[str, Tag]] = None) -> List[str]:
+    if headings is None:
+        headings = index_term_headings(root)
+    heading = headings.get(term_title)
     if heading is None:
         return []
     lvl = heading_level(heading.name)
     lines: List[str] = []
     for sib in heading.next_siblings:
-        if isinstance(sib, NavigableString):
+        name = getattr(sib, "name", None)
+        if name is None:
             continue
-        if isinstance(sib, Tag):
-            if sib.name and re.fullmatch(r"h[1-6]", sib.name):
-                if heading_level(sib.name) <= lvl:
-                    break
-            if sib.name in ("h5","h6","strong"):
-                continue
-            if sib.name in ("p","div","section"):
-                lines.extend(_extract_lines_from_block(sib))
-            elif sib.name in ("ul","ol"):
-                for li in sib.find_all("li"):
-                    lines.extend(_extract_lines_from_block(li))
-            elif sib.name == "table":
-                for tr in sib.find_all("tr"):
-                    tds = [td.get_text(" ", strip=True) for td in tr.find_all(["td","th"])]
-                    if len(tds) >= 2:
-                        lines.append(f"{tds[0]}  {tds[1]}")
+        if HEADING_RE.match(name):
+            if heading_level(name) <= lvl:
+                break
+        if name in ("h5","h6","strong"):
+            continue
+        if name in ("p","div","section"):
+            lines.extend(_extract_lines_from_block(sib))
+        elif name in ("ul","ol"):
+            for li in sib.find_all("li"):
+                lines.extend(_extract_lines_from_block(li))
+        elif name == "table":
+            for tr in sib.find_all("tr"):
+                tds = [td.get_text(" ", strip=True) for td in tr.find_all(["td","th"])]
+                if len(tds) >= 2:
+                    lines.append(f"{tds[0]}  {tds[1]}")
     clean = []
     seen = set()
     for line in lines:
@@ -155,26 +204,28 @@ def normalize_date_chunk(date_chunk: str, default_year: int) -> str:
          .replace("\u2013", "-").replace("\u2014", "-")
          .replace("–", "-").replace("—", "-"))
     low = s.lower()
-    for w in DOW_WORDS:
-        low = re.sub(rf"\b{w}\b", "", low)
+    low = DOW_RE.sub("", low)
     s = " ".join(low.split())
-    pairs = MD_PAIR.findall(s)
-    if len(pairs) >= 2:
-        (m1,d1),(m2,d2) = pairs[0], pairs[1]
+    # one scan: at most two month/day pairs are needed
+    pairs = MD_PAIR.finditer(s)
+    first = next(pairs, None)
+    second = next(pairs, None)
+    if second is not None:
+        (m1,d1),(m2,d2) = first.groups(), second.groups()
         return f"{_fmt(MONTH_MAP[m1], int(d1), default_year)} to {_fmt(MONTH_MAP[m2], int(d2), default_year)}"
-    elif len(pairs) == 1:
-        (m1,d1) = pairs[0]
-        after = s[MD_PAIR.search(s).end():]
-        m2day = re.search(r"-\s*(\d{1,2})\b", after)
+    elif first is not None:
+        (m1,d1) = first.groups()
+        m2day = RANGE_END_DAY.search(s, first.end())
         if m2day:
             return f"{_fmt(MONTH_MAP[m1], int(d1), default_year)} to {_fmt(MONTH_MAP[m1], int(m2day.group(1)), default_year)}"
         else:
             return _fmt(MONTH_MAP[m1], int(d1), default_year)
     return " ".join(date_chunk.split())
 
-def extract_term_rows(soup: BeautifulSoup, term_title: str, year: int) -> List[Tuple[str,str]]:
+def extract_term_rows(soup: BeautifulSoup, term_title: str, year: int,
+                      headings: Optional[Dict[str, Tag]] = None) -> List[Tuple[str,str]]:
     rows = []
-    for raw in iter_term_block(soup, term_title):
+    for raw in iter_term_block(soup, term_title, headings):
         maybe = split_event_and_date(raw)
         if not maybe:
             continue
@@ -184,6 +235,18 @@ def extract_term_rows(soup: BeautifulSoup, term_title: str, year: int) -> List[T
         rows.append((event, normalize_date_chunk(date_chunk, year)))
     return rows
 
+def iter_rows(soup: BeautifulSoup) -> Iterator[Tuple[str,str,str,str]]:
+    # overlapping page sections can repeat an event: emit each (term, event, date) once
+    seen = set()
+    headings = index_term_headings(soup)  # one heading scan shared by every term
+    for term, year in TERMS:
+        for event, date in extract_term_rows(soup, term, year, headings):
+            key = (term, event, date)
+            if key in seen:
+                continue
+            seen.add(key)
+            yield (term, event, date, SOURCE_URL)
+
 # ---------- import helpers ----------
 
 def ensure_schema(session):
@@ -195,84 +258,259 @@ def ensure_schema(session):
     """)
     session.run("CREATE INDEX event_term IF NOT EXISTS FOR (e:Event) ON (e.term);")
     session.run("CREATE INDEX event_name IF NOT EXISTS FOR (e:Event) ON (e.event);")
+    # block until the node-key index is ONLINE, so the first MERGE already seeks it
+    session.run("CALL db.awaitIndexes(300)").consume()
 
-def import_via_driver(uri: str, user: str, password: str, db: str, rows: List[Tuple[str,str,str,str]]):
-    driver = GraphDatabase.driver(uri, auth=(user, password))
-    with driver, driver.session(database=db) as session:
+def prepare_schema(driver, db: str):
+    """Create constraints/indexes once, in their own session, before any import batch."""
+    with driver.session(database=db) as session:
         ensure_schema(session)
-        # Parameterized UNWIND = fast bulk upsert
-        session.run("""
-        UNWIND $rows AS r
-        MERGE (e:Event { term: r.term, event: r.event, date: r.date })
-        SET e.source = r.source
-        """, rows=[{"term": t, "event": ev, "date": dt, "source": src} for (t, ev, dt, src) in rows])
-
-def write_csv(csv_path: Path, rows: List[Tuple[str,str,str,str]]):
+
+def get_driver(uri: str, user: str, password: str, pool_size: int = 16):
+    # built once in main() and passed to every step: sessions are cheap, drivers are not
+    driver = GraphDatabase.driver(uri, auth=(user, password), max_connection_pool_size=pool_size)
+    atexit.register(driver.close)
+    return driver
+
+def _chunked(seq: Sequence, size: int) -> Iterator[Sequence]:
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+# Fixed 4-column row shape, so the statement is built once. Rows go over Bolt
+# as plain (term, event, date, source) lists: no per-row dict and no repeated keys.
+_UPSERT_CYPHER = """
+UNWIND $rows AS r
+MERGE (e:Event { term: r[0], event: r[1], date: r[2] })
+SET e.source = r[3]
+"""
+
+def _upsert_batch(tx, batch: Sequence[Tuple[str,str,str,str]]):
+    tx.run(_UPSERT_CYPHER, rows=batch).consume()
+
+def _commit_batch(driver, db: str, batch: Sequence[Tuple[str,str,str,str]]):
+    # sessions are not thread-safe: a fresh one per batch, drawn from the shared pool.
+    # No bookmarks are passed or managed, so batches don't wait on each other's
+    # commits; execute_write retries transient errors.
+    with driver.session(database=db, default_access_mode=WRITE_ACCESS) as session:
+        session.execute_write(_upsert_batch, batch)
+
+def import_via_driver(driver, db: str, rows: Iterable[Tuple[str,str,str,str]],
+                      batch_size: int = BATCH_SIZE, workers: int = WORKERS) -> int:
+    """
+    Upsert rows with parameterized UNWIND in bounded write transactions, committed
+    in parallel. Rows are consumed in one pass (any iterable, e.g. tee_csv) and
+    binned on the node key: a bin has at most one batch in flight, so rows
+    MERGing the same (term, event, date) node are never written concurrently.
+    Returns the number of rows consumed.
+    """
+    n_bins = workers
+    pending: List[List[Tuple[str,str,str,str]]] = [[] for _ in range(n_bins)]
+    in_flight: List[Optional[Future]] = [None] * n_bins
+    count = 0
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        def flush(i: int):
+            if in_flight[i] is not None:
+                in_flight[i].result()
+            in_flight[i] = ex.submit(_commit_batch, driver, db, pending[i])
+            pending[i] = []
+
+        for r in rows:
+            count += 1
+            i = hash(r[:3]) % n_bins
+            pending[i].append(r)
+            if len(pending[i]) >= batch_size:
+                flush(i)
+        for i in range(n_bins):
+            if pending[i]:
+                flush(i)
+        for fut in in_flight:
+            if fut is not None:
+                fut.result()
+    return count
+
+def auto_tune_batch_size(driver, db: str, rows: List[Tuple[str,str,str,str]],
+                         sizes: Sequence[int] = AUTO_TUNE_SIZES, probe_batches: int = 3) -> int:
+    """
+    Time the first few batches at each candidate size and return the size with
+    the best rows/sec. MERGE is idempotent, so probed rows are safe to write again.
+    """
+    best_size, best_rate = sizes[0], 0.0
+    with driver.session(database=db) as session:
+        for size in sizes:
+            sample = rows[:size * probe_batches]
+            if not sample:
+                break
+            t0 = time.perf_counter()
+            for batch in _chunked(sample, size):
+                session.execute_write(_upsert_batch, batch)
+            rate = len(sample) / max(time.perf_counter() - t0, 1e-9)
+            print(f"[TUNE] batch {size}: {rate:,.0f} rows/s")
+            if rate > best_rate:
+                best_size, best_rate = size, rate
+            if size >= len(rows):
+                # larger sizes would send the exact same single batch
+                break
+    return best_size
+
+CSV_HEADER = ["Term", "event", "date", "source"]
+# neo4j-admin node header: same columns, typed; the label comes from --nodes=Event=...
+ADMIN_HEADER = ["term:string", "event:string", "date:string", "source:string"]
+
+def tee_csv(csv_path: Path, rows: Iterable[Tuple[str,str,str,str]],
+            header: List[str] = CSV_HEADER) -> Iterator[Tuple[str,str,str,str]]:
+    """
+    Write each row to the CSV as it passes through, then yield it on, so a single
+    traversal both produces the CSV and feeds the importer. Written through a
+    1 MiB buffer; a ".gz" path is gzip-compressed (LOAD CSV and neo4j-admin
+    read it as-is).
+    """
     csv_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(csv_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.writer(f)
-        w.writerow(["Term", "event", "date", "source"])
-        w.writerows(rows)
+    if csv_path.suffix == ".gz":
+        # level 1: most of the size win for a fraction of the CPU
+        f = gzip.open(csv_path, "wt", compresslevel=1, newline="", encoding="utf-8")
+    else:
+        f = open(csv_path, "w", newline="", encoding="utf-8", buffering=1 << 20)
+    with f:
+        # "\n" line endings, quoting only fields that need it (event names can contain commas)
+        w = csv.writer(f, dialect="unix", quoting=csv.QUOTE_MINIMAL)
+        w.writerow(header)
+        for row in rows:
+            w.writerow(row)
+            yield row
 
-def import_via_loadcsv(uri: str, user: str, password: str, db: str, import_dir: Path, csv_name: str):
+def write_csv(csv_path: Path, rows: Iterable[Tuple[str,str,str,str]], header: List[str] = CSV_HEADER) -> int:
+    """Stream rows (any iterable, e.g. iter_rows) into the CSV. Returns the number of data rows written."""
+    return sum(1 for _ in tee_csv(csv_path, rows, header))
+
+def import_via_loadcsv(driver, db: str, import_dir: Path, csv_name: str,
+                       batch_size: int = BATCH_SIZE):
     """
-    Writes the CSV into import_dir (creates folder if missing) then runs LOAD CSV.
+    Writes the CSV into import_dir (creates folder if missing) then runs LOAD CSV,
+    committing every `batch_size` rows.
     """
     import_dir.mkdir(parents=True, exist_ok=True)
     # Neo4j expects the file to be named exactly and referenced as file:///NAME.csv
     csv_path = import_dir / csv_name
 
-    driver = GraphDatabase.driver(uri, auth=(user, password))
-    with driver, driver.session(database=db) as session:
-        ensure_schema(session)
-        # LOAD CSV (Browser security reads only from import/)
-        session.run("""
+    with driver.session(database=db) as session:
+        # LOAD CSV (Browser security reads only from import/).
+        # CALL {} IN TRANSACTIONS needs an auto-commit transaction: session.run, not execute_write.
+        session.run(f"""
         LOAD CSV WITH HEADERS FROM $url AS row
-        MERGE (e:Event { term: row.Term, event: row.event, date: row.date })
-        SET e.source = row.source
-        """, url=f"file:///{csv_name}")
+        CALL {{
+          WITH row
+          MERGE (e:Event {{ term: row.Term, event: row.event, date: row.date }})
+          SET e.source = row.source
+        }} IN TRANSACTIONS OF {int(batch_size)} ROWS
+        """, url=f"file:///{csv_name}").consume()
+
+def import_via_admin(db: str, nodes_csv: Path, admin_bin: str = "neo4j-admin", overwrite: bool = False):
+    """
+    Offline bulk load with `neo4j-admin database import full` (Neo4j 5).
+    Writes straight to the store files, so the database must be stopped. An existing
+    store is only replaced when `overwrite` is set; otherwise neo4j-admin refuses.
+    """
+    cmd = [admin_bin, "database", "import", "full",
+           f"--nodes=Event={nodes_csv.resolve()}"]
+    if overwrite:
+        cmd.append("--overwrite-destination")
+    cmd.append(db)
+    print("[RUN] " + " ".join(cmd))
+    subprocess.run(cmd, check=True)
+
+def _positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return n
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--method", choices=["driver","loadcsv"], required=True,
-                        help="driver = direct insert with Neo4j driver (recommended); loadcsv = write into import/ then LOAD CSV")
-    parser.add_argument("--bolt", required=True, help="bolt://host:7687")
-    parser.add_argument("--user", required=True)
-    parser.add_argument("--password", required=True)
+    parser.add_argument("--method", choices=["driver","loadcsv","admin"], required=True,
+                        help="driver = direct insert with Neo4j driver (recommended); loadcsv = write into import/ then LOAD CSV; "
+                             "admin = offline neo4j-admin bulk import (database must be stopped)")
+    parser.add_argument("--bolt", help="bolt://host:7687 (not needed for --method admin)")
+    parser.add_argument("--user")
+    parser.add_argument("--password")
     parser.add_argument("--db", default="neo4j")
-    parser.add_argument("--csv-out", default="data/events.csv", help="Where to save the CSV we generate")
+    parser.add_argument("--csv-out", default="data/events.csv",
+                        help="Where to save the CSV we generate (end in .gz for a gzip-compressed CSV)")
     parser.add_argument("--import-dir", default="", help="(Only for --method loadcsv) Path to Neo4j Desktop import folder")
     parser.add_argument("--csv-name", default="events.csv", help="(Only for --method loadcsv) Name of CSV inside import/")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always re-download the calendar page (skip the requests-cache HTTP cache)")
+    parser.add_argument("--batch-size", type=_positive_int, default=BATCH_SIZE,
+                        help="Rows per write transaction (driver: UNWIND batch; loadcsv: IN TRANSACTIONS OF n ROWS)")
+    parser.add_argument("--workers", type=_positive_int, default=WORKERS,
+                        help="(Only for --method driver) Batches committed in parallel, one session each")
+    parser.add_argument("--auto-tune-batch", action="store_true",
+                        help="(Only for --method driver) Probe batch sizes on the first rows and use the fastest")
+    parser.add_argument("--admin-bin", default="neo4j-admin", help="(Only for --method admin) Path to the neo4j-admin executable")
+    parser.add_argument("--admin-overwrite", action="store_true",
+                        help="(Only for --method admin) Replace the existing database (--overwrite-destination)")
     args = parser.parse_args()
+    if args.method != "admin" and not (args.bolt and args.user and args.password):
+        parser.error("--bolt, --user and --password are required for --method driver/loadcsv")
 
-    # 1) Scrape + assemble rows
-    soup = fetch_html(SOURCE_URL)
-    rows = []
-    for term, year in TERMS:
-        for event, date in extract_term_rows(soup, term, year):
-            rows.append((term, event, date, SOURCE_URL))
-
-    # 2) Write CSV (for your artifacts)
+    # 1) Scrape; rows are produced lazily
+    soup = fetch_html(SOURCE_URL, use_cache=not args.no_cache)
+    rows = iter_rows(soup)
+    # auto-tuning re-reads the first rows and admin writes them twice: only those need a list
+    if args.method == "admin" or (args.method == "driver" and args.auto_tune_batch):
+        rows = list(rows)
     csv_out_path = Path(args.csv_out)
-    write_csv(csv_out_path, rows)
-    print(f"[OK] Wrote CSV -> {csv_out_path.resolve()}  (rows: {len(rows)})")
 
-    # 3) Import
+    # Online methods: one driver for the whole run, with a pooled connection for
+    # every worker; schema first, so every MERGE is an index seek
+    if args.method != "admin":
+        driver = get_driver(args.bolt, args.user, args.password, pool_size=max(16, args.workers))
+        prepare_schema(driver, args.db)
+
     if args.method == "driver":
-        import_via_driver(args.bolt, args.user, args.password, args.db, rows)
+        batch_size = args.batch_size
+        if args.auto_tune_batch:
+            batch_size = auto_tune_batch_size(driver, args.db, rows)
+            print(f"[OK] Auto-tuned batch size -> {batch_size}")
+        # 2+3) One pass: each row is written to the CSV (for your artifacts) as it is batched into Neo4j
+        n_rows = import_via_driver(driver, args.db, tee_csv(csv_out_path, rows),
+                                   batch_size=batch_size, workers=args.workers)
+        print(f"[OK] Wrote CSV -> {csv_out_path.resolve()}  (rows: {n_rows})")
         print("[OK] Imported via Neo4j driver (no import/ folder needed).")
     else:
-        if not args.import_dir:
-            raise SystemExit("--import-dir is required for --method loadcsv")
-        # Copy CSV to import dir
-        # (we already wrote it to csv_out_path; now copy its contents)
-        import_dir = Path(args.import_dir)
-        import_dir.mkdir(parents=True, exist_ok=True)
-        dest = import_dir / args.csv_name
-        if csv_out_path.resolve() != dest.resolve():
-            dest.write_bytes(csv_out_path.read_bytes())
-        import_via_loadcsv(args.bolt, args.user, args.password, args.db, import_dir, args.csv_name)
-        print(f"[OK] Imported via LOAD CSV from {dest}")
+        # 2) Write CSV (for your artifacts)
+        n_rows = write_csv(csv_out_path, rows)
+        print(f"[OK] Wrote CSV -> {csv_out_path.resolve()}  (rows: {n_rows})")
+
+        # 3) Import
+        if args.method == "admin":
+            # events.csv -> events.admin.csv, events.csv.gz -> events.admin.csv.gz
+            suffixes = "".join(csv_out_path.suffixes)
+            admin_csv = csv_out_path.with_name(csv_out_path.name[:-len(suffixes) or None] + ".admin" + suffixes)
+            write_csv(admin_csv, rows, header=ADMIN_HEADER)
+            import_via_admin(args.db, admin_csv, admin_bin=args.admin_bin, overwrite=args.admin_overwrite)
+            print(f"[OK] Imported via neo4j-admin from {admin_csv}. Start the database, then run "
+                  "--method driver once (or create the constraints) to add the schema.")
+        else:
+            if not args.import_dir:
+                raise SystemExit("--import-dir is required for --method loadcsv")
+            # Stage CSV in import dir
+            # (hard link when on the same filesystem, else a streamed copy)
+            import_dir = Path(args.import_dir)
+            import_dir.mkdir(parents=True, exist_ok=True)
+            csv_name = args.csv_name
+            if csv_out_path.suffix == ".gz" and not csv_name.endswith(".gz"):
+                csv_name += ".gz"
+            dest = import_dir / csv_name
+            if csv_out_path.resolve() != dest.resolve():
+                if dest.exists():
+                    dest.unlink()
+                try:
+                    os.link(csv_out_path, dest)
+                except OSError:
+                    shutil.copyfile(csv_out_path, dest)
+            import_via_loadcsv(driver, args.db, import_dir, csv_name,
+                               batch_size=args.batch_size)
+            print(f"[OK] Imported via LOAD CSV from {dest}")
     print("[DONE] ETL + import complete.")
 
 if __name__ == "__main__":